@@ -6,8 +6,29 @@ Downloads records from the Hugging Face dataset and stores them in MongoDB.
 
 import json
 import os
+import re
 import sys
 
+# Maximum number of product upserts sent in a single bulk_write call
+PRODUCTS_BULK_WRITE_BATCH_SIZE = 1000
+
+# Maximum number of category upserts sent in a single bulk_write call
+CATEGORIES_BULK_WRITE_BATCH_SIZE = 1000
+
+# Full names of collections already known to have an index on "name"
+_INDEXED_COLLECTIONS = set()
+
+# Separator between categories in a full path, with any surrounding whitespace
+_CATEGORY_PATH_SEPARATOR = re.compile(r'\s+>\s+')
+
+# Environment variable values that turn a flag on (compared lowercased)
+_TRUE_VALUES = frozenset({'true', '1', 'yes', 'on'})
+
+
+def is_save_to_mongo_enabled() -> bool:
+    """Check the SAVE_TO_MONGO environment variable (default: true)."""
+    return os.getenv('SAVE_TO_MONGO', 'true').strip().lower() in _TRUE_VALUES
+
 
 def is_valid_product(record):
     """
@@ -36,26 +57,20 @@ def is_valid_product(record):
     if not has_valid_name:
         return False
     
-    # Check categories
+    # Check categories, stopping at the first valid one
     categories = record.get('categories', '')
-    has_valid_category = False
     
     if categories:
-        # Split by comma and check each category
-        category_list = [c.strip() for c in categories.split(',') if c.strip()]
-        for category in category_list:
-            if category:
-                # Check if category starts with "pl:" (case insensitive) or has no colon
-                if category.lower().startswith('pl:'):
-                    pl_category = category[3:]  # Remove "pl:" prefix
-                    if pl_category:  # Only consider valid if non-empty after prefix removal
-                        has_valid_category = True
-                        break
-                elif ':' not in category:
-                    has_valid_category = True
-                    break
+        for category in categories.split(','):
+            category = category.strip()
+            # Check if category starts with "pl:" (case insensitive) or has no colon
+            if category.lower().startswith('pl:'):
+                if category[3:]:  # Only consider valid if non-empty after prefix removal
+                    return True
+            elif category and ':' not in category:
+                return True
     
-    return has_valid_category
+    return False
 
 
 def download_from_huggingface():
@@ -64,15 +79,13 @@ def download_from_huggingface():
         from datasets import load_dataset
         
         # Check if we should save to MongoDB (default: true)
-        save_to_mongo = os.getenv('SAVE_TO_MONGO', 'true').lower() in ('true', '1', 'yes', 'on')
-        
-        save_to_mongo = os.getenv('SAVE_TO_MONGO', 'true').lower() in ('true', '1', 'yes', 'on')
+        save_to_mongo = is_save_to_mongo_enabled()
         
         client = None
         collection = None
         
         if save_to_mongo:
-            from pymongo import MongoClient
+            from pymongo import MongoClient, ReplaceOne
             from pymongo.errors import ConnectionFailure, ConfigurationError
             
             # Get MongoDB URI from environment variable
@@ -117,124 +130,129 @@ def download_from_huggingface():
         unique_categories = set()  # Collect unique category tags
         unique_last_categories = {}  # Collect unique last category mapping to full path
         
-        # Process records and optionally store directly in MongoDB
+        # Process records and optionally store them in MongoDB in batches
         skipped_count = 0
-        for i, record in enumerate(dataset):
-            # if i >= 5:
-            #     break
+        stored_count = 0
+        pending_products = []
+        try:
+            for i, record in enumerate(dataset):
+                # if i >= 5:
+                #     break
             
-            # Validate product before processing
-            if not is_valid_product(record):
-                skipped_count += 1
-                if skipped_count <= 10:  # Log first 10 skipped products for debugging
-                    print(f"Skipped product {record.get('code', 'unknown')}: Missing valid product name or category without ':'")
-                continue
+                # Validate product before processing
+                if not is_valid_product(record):
+                    skipped_count += 1
+                    if skipped_count <= 10:  # Log first 10 skipped products for debugging
+                        print(f"Skipped product {record.get('code', 'unknown')}: Missing valid product name or category without ':'")
+                    continue
             
-            # Extract unique product names from product_name array
-            product_names = record.get('product_name', [])
-            unique_product_names = []
-            if isinstance(product_names, list):
-                seen_texts = set()
-                for name_obj in product_names:
-                    if isinstance(name_obj, dict) and 'text' in name_obj:
-                        text = name_obj['text']
-                        if text and text not in seen_texts:
-                            unique_product_names.append(text)
-                            seen_texts.add(text)
+                # Extract unique product names from product_name array
+                product_names = record.get('product_name', [])
+                unique_product_names = []
+                if isinstance(product_names, list):
+                    seen_texts = set()
+                    for name_obj in product_names:
+                        if isinstance(name_obj, dict) and 'text' in name_obj:
+                            text = name_obj['text']
+                            if text and text not in seen_texts:
+                                unique_product_names.append(text)
+                                seen_texts.add(text)
             
-            # Build search_string by concatenating specified fields
-            search_components = []
+                # Build search_string by concatenating specified fields
+                search_components = []
             
-            # Add unique product names
-            search_components.extend(unique_product_names)
+                # Add unique product names
+                search_components.extend(unique_product_names)
             
-            # Add quantity
-            quantity = record.get('quantity', '')
-            if quantity:
-                search_components.append(quantity)
+                # Add quantity
+                quantity = record.get('quantity', '')
+                if quantity:
+                    search_components.append(quantity)
             
-            # Add brands  
-            brands = record.get('brands', '')
-            if brands:
-                search_components.append(brands)
+                # Add brands  
+                brands = record.get('brands', '')
+                if brands:
+                    search_components.append(brands)
             
-            # Add categories
-            categories = record.get('categories', '')
-            if categories:
-                search_components.append(categories)
+                # Add categories
+                categories = record.get('categories', '')
+                if categories:
+                    search_components.append(categories)
             
-            # Add labels
-            labels = record.get('labels', '')
-            if labels:
-                search_components.append(labels)
+                # Add labels
+                labels = record.get('labels', '')
+                if labels:
+                    search_components.append(labels)
             
-            # Create space-separated search string (lowercase)
-            search_string = ' '.join(search_components).lower().replace(',', ' ')
-
-            product = {
-                '_id': record.get('code'),
-                'lang': record.get('lang'),
-                'product_name': record.get('product_name'),
-                'brands': record.get('brands'),
-                'food_groups_tags': record.get('food_groups_tags'),
-                'product_quantity_unit': record.get('product_quantity_unit'),
-                'product_quantity': record.get('product_quantity'),
-                'quantity': record.get('quantity'),
-                'categories_tags': record.get('categories_tags'),
-                'categories': [c.strip() for c in record.get('categories', '').split(',') if record.get('categories')] if record.get('categories') else [],
-                'labels_tags': record.get('labels_tags'),
-                'labels': [l.strip() for l in record.get('labels', '').split(',') if record.get('labels')] if record.get('labels') else [],
-                'popularity_key': record.get('popularity_key'),
-                'popularity_tags': record.get('popularity_tags'),
-                'nutriscore_grade': record.get('nutriscore_grade'),
-                'nutriscore_score': record.get('nutriscore_score'),
-                'search_string': search_string,
-            }
+                # Create space-separated search string (lowercase)
+                search_string = ' '.join(search_components).lower().replace(',', ' ')
+
+                product = {
+                    '_id': record.get('code'),
+                    'lang': record.get('lang'),
+                    'product_name': record.get('product_name'),
+                    'brands': record.get('brands'),
+                    'food_groups_tags': record.get('food_groups_tags'),
+                    'product_quantity_unit': record.get('product_quantity_unit'),
+                    'product_quantity': record.get('product_quantity'),
+                    'quantity': record.get('quantity'),
+                    'categories_tags': record.get('categories_tags'),
+                    'categories': [c.strip() for c in record.get('categories', '').split(',') if record.get('categories')] if record.get('categories') else [],
+                    'labels_tags': record.get('labels_tags'),
+                    'labels': [l.strip() for l in record.get('labels', '').split(',') if record.get('labels')] if record.get('labels') else [],
+                    'popularity_key': record.get('popularity_key'),
+                    'popularity_tags': record.get('popularity_tags'),
+                    'nutriscore_grade': record.get('nutriscore_grade'),
+                    'nutriscore_score': record.get('nutriscore_score'),
+                    'search_string': search_string,
+                }
             
-            # Store product directly in MongoDB (upsert to handle duplicates) if enabled
-            if save_to_mongo and collection is not None:
-                try:
-                    collection.replace_one({'_id': product['_id']}, product, upsert=True)
-                except Exception as e:
-                    print(f"Error upserting product {product.get('_id')}: {e}")
-                    continue
-
-            # Collect unique food groups tags
-            food_groups_tags = record.get('food_groups_tags', [])
-            if food_groups_tags:
-                # Add all tags to unique set
-                unique_food_groups.update(food_groups_tags)
-
-            # Collect unique categories from categories field
-            categories = record.get('categories', '')
-            if categories:
-                # Split by comma and add each category to unique set
-                category_list = [c.strip() for c in categories.split(',') if c.strip()]
-                unique_categories.update(category_list)
+                # Queue product for a batched MongoDB upsert (to handle duplicates) if enabled
+                if save_to_mongo and collection is not None:
+                    pending_products.append(ReplaceOne({'_id': product['_id']}, product, upsert=True))
+                    if len(pending_products) >= PRODUCTS_BULK_WRITE_BATCH_SIZE:
+                        stored_count += upsert_products_batch(collection, pending_products)
+                        pending_products = []
+
+                # Collect unique food groups tags
+                food_groups_tags = record.get('food_groups_tags', [])
+                if food_groups_tags:
+                    # Add all tags to unique set
+                    unique_food_groups.update(food_groups_tags)
+
+                # Collect unique categories from categories field
+                categories = record.get('categories', '')
+                if categories:
+                    # Split by comma and add each category to unique set
+                    category_list = [c.strip() for c in categories.split(',') if c.strip()]
+                    unique_categories.update(category_list)
                 
-                # Build mapping from last category to full path, skipping categories with ":"
-                if category_list:
-                    # Filter out categories containing ":"
-                    filtered_categories = [cat for cat in category_list if ':' not in cat]
+                    # Build mapping from last category to full path, skipping categories with ":"
+                    if category_list:
+                        # Filter out categories containing ":"
+                        filtered_categories = [cat for cat in category_list if ':' not in cat]
                     
-                    if filtered_categories:
-                        # Get the last category
-                        last_category = filtered_categories[-1]
+                        if filtered_categories:
+                            # Get the last category
+                            last_category = filtered_categories[-1]
                         
-                        # Build full path using ">" separator
-                        full_path = " > ".join(filtered_categories)
+                            # Build full path using ">" separator
+                            full_path = " > ".join(filtered_categories)
                         
-                        # Store the mapping
-                        unique_last_categories[last_category] = full_path
+                            # Store the mapping
+                            unique_last_categories[last_category] = full_path
 
-            lang = record.get('lang', "None_LANG_ATTRIBUTE")
-            langs_map[lang] = langs_map.get(lang, 0) + 1
+                lang = record.get('lang', "None_LANG_ATTRIBUTE")
+                langs_map[lang] = langs_map.get(lang, 0) + 1
 
-            if save_to_mongo:
-                print(f"Record {i + 1}: {product.get('_id')} - Stored in MongoDB")
-            else:
-                print(f"Record {i + 1}: {product.get('_id')} - Processed (MongoDB storage disabled)")
-            
+                if save_to_mongo:
+                    print(f"Record {i + 1}: {product.get('_id')} - Queued for MongoDB")
+                else:
+                    print(f"Record {i + 1}: {product.get('_id')} - Processed (MongoDB storage disabled)")
+        finally:
+            # Store the last partial batch of products, also when the stream fails midway
+            if pending_products:
+                stored_count += upsert_products_batch(collection, pending_products)
 
         print("Language distribution:")
         for lang, count in langs_map.items():
@@ -242,7 +260,7 @@ def download_from_huggingface():
         
         processed_count = i + 1 - skipped_count  # Total processed minus skipped
         if save_to_mongo:
-            print(f"Successfully processed and stored {processed_count} records in MongoDB")
+            print(f"Successfully processed {processed_count} records and stored {stored_count} in MongoDB")
         else:
             print(f"Successfully processed {processed_count} records (MongoDB storage was disabled)")
         
@@ -271,6 +289,35 @@ def download_from_huggingface():
 
 
 
+def upsert_products_batch(collection, operations: list) -> int:
+    """
+    Send a batch of product upserts to MongoDB in a single unordered bulk_write.
+    
+    Unordered writes let the server apply the remaining upserts when one of them fails.
+    
+    Args:
+        collection: MongoDB products collection
+        operations: List of ReplaceOne upsert operations
+        
+    Returns:
+        int: Number of products inserted or updated
+    """
+    from pymongo.errors import BulkWriteError
+    
+    try:
+        result = collection.bulk_write(operations, ordered=False)
+        return result.upserted_count + result.matched_count
+    except BulkWriteError as e:
+        write_errors = e.details.get('writeErrors', [])
+        for error in write_errors[:5]:  # Log first 5 for debugging
+            print(f"Error upserting product {error.get('op', {}).get('q', {}).get('_id')}: {error.get('errmsg')}")
+        print(f"Failed to upsert {len(write_errors)} of {len(operations)} products in batch")
+        return len(operations) - len(write_errors)
+    except Exception as e:
+        print(f"Error upserting batch of {len(operations)} products: {e}")
+        return 0
+
+
 def save_unique_food_groups_to_json(unique_food_groups: set) -> None:
     """Save unique food group tags to a separate file."""
     filename = "unique_food_groups.json"
@@ -327,32 +374,38 @@ def store_categories_collection(db, unique_last_categories: dict) -> None:
     }
     
     Before storing, checks if standard index on "name" exists, if not - creates it.
+    The check is done once per collection and remembered for later calls.
     
     Args:
         db: MongoDB database instance
         unique_last_categories: Dictionary mapping last category to full path
     """
     try:
+        from pymongo import UpdateOne
+        from pymongo.errors import BulkWriteError
+        
         collection = db['categories']
         print(f"\nProcessing categories collection...")
         
-        # Check if index on "name" exists, create if not
-        existing_indexes = list(collection.list_indexes())
-        name_index_exists = any(
-            'name' in index.get('key', {}) 
-            for index in existing_indexes
-        )
-        
-        if not name_index_exists:
-            print("Creating index on 'name' field...")
-            collection.create_index('name')
-            print("Index on 'name' field created successfully")
-        else:
-            print("Index on 'name' field already exists")
+        # Check if index on "name" exists, create if not (only once per collection)
+        if collection.full_name not in _INDEXED_COLLECTIONS:
+            existing_indexes = list(collection.list_indexes())
+            name_index_exists = any(
+                'name' in index.get('key', {}) 
+                for index in existing_indexes
+            )
+            
+            if not name_index_exists:
+                print("Creating index on 'name' field...")
+                collection.create_index('name')
+                print("Index on 'name' field created successfully")
+            else:
+                print("Index on 'name' field already exists")
+            
+            _INDEXED_COLLECTIONS.add(collection.full_name)
         
-        # Process each category mapping
-        categories_processed = 0
-        categories_updated = 0
+        # Build one upsert operation per category mapping
+        operations = []
         
         for category_name, full_path in unique_last_categories.items():
             if not category_name or not full_path:
@@ -360,7 +413,7 @@ def store_categories_collection(db, unique_last_categories: dict) -> None:
                 
             # Parse the full path to extract ancestors
             # Example: "Food > Spreads > Chocolate Spreads" -> ancestors: ["Food", "Spreads"]
-            path_parts = [part.strip() for part in full_path.split(' > ') if part.strip()]
+            path_parts = [part for part in _CATEGORY_PATH_SEPARATOR.split(full_path.strip()) if part]
             
             # The ancestors are all parts except the last one (which is the category name itself)
             ancestors = path_parts[:-1] if len(path_parts) > 1 else []
@@ -370,32 +423,43 @@ def store_categories_collection(db, unique_last_categories: dict) -> None:
                 print(f"Warning: Category name mismatch: '{category_name}' vs '{path_parts[-1]}' in path '{full_path}'")
                 continue
             
-            # Create category document
-            category_doc = {
-                'name': category_name,
-                'ancestors': ancestors
-            }
-            
             # Upsert the category (update if exists, insert if not)
-            result = collection.replace_one(
-                {'name': category_name}, 
-                category_doc, 
+            operations.append(UpdateOne(
+                {'name': category_name},
+                {'$set': {'name': category_name, 'ancestors': ancestors}},
                 upsert=True
-            )
+            ))
             
-            categories_processed += 1
-            if result.upserted_id:
-                categories_updated += 1
-                if categories_processed <= 5:  # Log first 5 for debugging
-                    print(f"  Inserted category: '{category_name}' with ancestors: {ancestors}")
-            else:
-                if categories_processed <= 5:  # Log first 5 for debugging
-                    print(f"  Updated category: '{category_name}' with ancestors: {ancestors}")
+            if len(operations) <= 5:  # Log first 5 for debugging
+                print(f"  Prepared category: '{category_name}' with ancestors: {ancestors}")
+        
+        # Send the upserts in batches, one round trip per batch
+        categories_inserted = 0
+        categories_updated = 0
+        categories_failed = 0
+        
+        for start in range(0, len(operations), CATEGORIES_BULK_WRITE_BATCH_SIZE):
+            batch = operations[start:start + CATEGORIES_BULK_WRITE_BATCH_SIZE]
+            try:
+                result = collection.bulk_write(batch, ordered=False)
+                categories_inserted += result.upserted_count
+                categories_updated += result.matched_count
+            except BulkWriteError as e:
+                # Unordered writes apply the rest of the batch; count them and keep going
+                categories_inserted += e.details.get('nUpserted', 0)
+                categories_updated += e.details.get('nMatched', 0)
+                write_errors = e.details.get('writeErrors', [])
+                for error in write_errors[:5]:  # Log first 5 for debugging
+                    print(f"Error upserting category {error.get('op', {}).get('q', {}).get('name')}: {error.get('errmsg')}")
+                print(f"Failed to upsert {len(write_errors)} of {len(batch)} categories in batch")
+                categories_failed += len(write_errors)
         
         print(f"Categories collection processing complete:")
-        print(f"  Total categories processed: {categories_processed}")
-        print(f"  New categories inserted: {categories_updated}")
-        print(f"  Existing categories updated: {categories_processed - categories_updated}")
+        print(f"  Total categories processed: {len(operations)}")
+        print(f"  New categories inserted: {categories_inserted}")
+        print(f"  Existing categories updated: {categories_updated}")
+        if categories_failed:
+            print(f"  Failed categories: {categories_failed}")
         
     except Exception as e:
         print(f"Error storing categories collection: {e}")
@@ -406,7 +470,7 @@ def store_categories_collection(db, unique_last_categories: dict) -> None:
 def main():
     """Main function to download and optionally store food records in MongoDB."""
     print("OpenFoodFacts Product Downloader")
-    save_to_mongo = os.getenv('SAVE_TO_MONGO', 'true').lower() in ('true', '1', 'yes', 'on')
+    save_to_mongo = is_save_to_mongo_enabled()
     
     if save_to_mongo:
         print("Downloading food records from dataset and storing in MongoDB")
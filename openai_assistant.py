@@ -19,6 +19,24 @@ LEVEL_2_MODEL = "gpt-4"
 SCORE_THRESHOLD = 550.0
 
 
+def _export_conversation_file(conversation: List[Dict[str, Any]], model: str, path: str) -> None:
+    """
+    Write a single model conversation history to a UTF-8 JSON file.
+    
+    Args:
+        conversation: List of chat messages exchanged with the model
+        model: Name of the model the conversation belongs to
+        path: Target file path
+    """
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({
+            "model": model,
+            "conversation": conversation,
+            "total_messages": len(conversation),
+            "exported_at": datetime.now().isoformat()
+        }, f, indent=2, ensure_ascii=False)
+
+
 @dataclass
 class OpenAIResult:
     """Data class for OpenAI search results."""
@@ -41,10 +59,10 @@ class OpenAIAssistant:
         return cls._instance
     
     def __init__(self):
-        """Initialize OpenAI client only once."""
+        """Initialize assistant state only once; the OpenAI client is created lazily."""
         if not self._initialized:
-            self.client = None
-            self._init_client()
+            self._client = None
+            self._client_loaded = False
             # Track conversation history for each model
             self.level1_conversation = []
             self.level2_conversation = []
@@ -52,6 +70,14 @@ class OpenAIAssistant:
             self.level2_first_call = True
             OpenAIAssistant._initialized = True
     
+    @property
+    def client(self):
+        """OpenAI client, created on first use so searches that never need it skip the openai import."""
+        if not self._client_loaded:
+            self._client_loaded = True
+            self._init_client()
+        return self._client
+    
     def _init_client(self):
         """Initialize OpenAI client with API key from environment."""
         try:
@@ -61,7 +87,7 @@ class OpenAIAssistant:
                 return
             
             import openai
-            self.client = openai.OpenAI(api_key=api_key)
+            self._client = openai.OpenAI(api_key=api_key)
             
         except ImportError:
             print("Warning: OpenAI package not installed. Run: pip install openai")
@@ -351,26 +377,14 @@ If the query is unclear, try to intelligently interpret abbreviations and provid
             # Export Level 1 conversation if it exists
             if self.level1_conversation:
                 level1_file = os.path.join(output_dir, "openai_level1_conversation.json")
-                with open(level1_file, 'w', encoding='utf-8') as f:
-                    json.dump({
-                        "model": LEVEL_1_MODEL,
-                        "conversation": self.level1_conversation,
-                        "total_messages": len(self.level1_conversation),
-                        "exported_at": datetime.now().isoformat()
-                    }, f, indent=2, ensure_ascii=False)
+                _export_conversation_file(self.level1_conversation, LEVEL_1_MODEL, level1_file)
                 exported_files["level1"] = level1_file
                 print(f"Exported Level 1 conversation to: {level1_file}")
             
             # Export Level 2 conversation if it exists
             if self.level2_conversation:
                 level2_file = os.path.join(output_dir, "openai_level2_conversation.json")
-                with open(level2_file, 'w', encoding='utf-8') as f:
-                    json.dump({
-                        "model": LEVEL_2_MODEL,
-                        "conversation": self.level2_conversation,
-                        "total_messages": len(self.level2_conversation),
-                        "exported_at": datetime.now().isoformat()
-                    }, f, indent=2, ensure_ascii=False)
+                _export_conversation_file(self.level2_conversation, LEVEL_2_MODEL, level2_file)
                 exported_files["level2"] = level2_file
                 print(f"Exported Level 2 conversation to: {level2_file}")
                 
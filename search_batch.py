@@ -12,20 +12,21 @@ import csv
 import os
 import sys
 import argparse
+from itertools import islice
 from datetime import datetime
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, List, Optional, TextIO, Tuple, Union
 
 from search_products import search_products
 
 
-def display_csv_as_table(csv_file_path: str, max_rows: int = 200, max_col_width: int = 30) -> bool:
+def display_csv_as_table(csv_source: Union[str, TextIO], max_rows: int = 200, max_col_width: int = 30) -> bool:
     """
     Display CSV file content in a nice table format.
     For GitHub Actions, writes markdown table to GITHUB_STEP_SUMMARY.
     For console, displays Unicode table format.
     
     Args:
-        csv_file_path: Path to the CSV file
+        csv_source: Path to the CSV file or an open text stream with CSV content
         max_rows: Maximum number of rows to display (excluding header)
         max_col_width: Maximum width for each column
         
@@ -33,20 +34,23 @@ def display_csv_as_table(csv_file_path: str, max_rows: int = 200, max_col_width:
         True if successfully displayed, False otherwise
     """
     try:
-        if not os.path.exists(csv_file_path):
-            print(f"❌ CSV file not found: {csv_file_path}")
-            return False
-        
-        with open(csv_file_path, 'r', encoding='utf-8') as csvfile:
-            reader = csv.reader(csvfile)
-            rows = list(reader)
+        if isinstance(csv_source, str):
+            if not os.path.exists(csv_source):
+                print(f"❌ CSV file not found: {csv_source}")
+                return False
+            
+            csv_file_path = csv_source
+            with open(csv_source, 'r', newline='', encoding='utf-8') as csvfile:
+                table = _read_csv_table(csvfile, max_rows)
+        else:
+            csv_file_path = getattr(csv_source, 'name', 'CSV stream')
+            table = _read_csv_table(csv_source, max_rows)
         
-        if not rows:
+        if table is None:
             print("❌ CSV file is empty")
             return False
         
-        headers = rows[0]
-        data_rows = rows[1:]
+        headers, data_rows, total_rows = table
         
         # Check if running in GitHub Actions
         github_step_summary = os.environ.get('GITHUB_STEP_SUMMARY')
@@ -54,17 +58,40 @@ def display_csv_as_table(csv_file_path: str, max_rows: int = 200, max_col_width:
         
         if is_github_actions:
             # Display markdown table for GitHub Actions
-            return _display_markdown_table(github_step_summary, csv_file_path, headers, data_rows, max_rows, max_col_width)
+            return _display_markdown_table(github_step_summary, csv_file_path, headers, data_rows, total_rows, max_rows, max_col_width)
         else:
             # Display Unicode table for console
-            return _display_console_table(headers, data_rows, max_rows, max_col_width)
+            return _display_console_table(headers, data_rows, total_rows, max_rows, max_col_width)
         
     except Exception as e:
         print(f"❌ Error displaying CSV table: {e}")
         return False
 
 
-def _display_markdown_table(github_step_summary: str, csv_file_path: str, headers: List[str], data_rows: List[List[str]], max_rows: int, max_col_width: int) -> bool:
+def _read_csv_table(csvfile: TextIO, max_rows: int) -> Optional[Tuple[List[str], List[List[str]], int]]:
+    """
+    Read the header and the rows to display from CSV content.
+    
+    Args:
+        csvfile: Open text stream with CSV content
+        max_rows: Maximum number of data rows to keep
+        
+    Returns:
+        Tuple of (headers, displayed data rows, total number of data rows),
+        or None if the CSV content is empty
+    """
+    reader = csv.reader(csvfile)
+    headers = next(reader, None)
+    if headers is None:
+        return None
+    
+    # Keep only the displayed rows in memory, just count the rest
+    data_rows = list(islice(reader, max(max_rows, 0)))
+    total_rows = len(data_rows) + sum(1 for _ in reader)
+    return headers, data_rows, total_rows
+
+
+def _display_markdown_table(github_step_summary: str, csv_file_path: str, headers: List[str], data_rows: List[List[str]], total_rows: int, max_rows: int, max_col_width: int) -> bool:
     """
     Display CSV content as markdown table in GitHub Actions step summary.
     
@@ -72,7 +99,8 @@ def _display_markdown_table(github_step_summary: str, csv_file_path: str, header
         github_step_summary: Path to GITHUB_STEP_SUMMARY file
         csv_file_path: Path to CSV file (for filename display)
         headers: CSV headers
-        data_rows: CSV data rows
+        data_rows: CSV data rows to display
+        total_rows: Number of data rows in the CSV file
         max_rows: Maximum rows to display
         max_col_width: Maximum column width
         
@@ -83,7 +111,7 @@ def _display_markdown_table(github_step_summary: str, csv_file_path: str, header
         with open(github_step_summary, 'a', encoding='utf-8') as f:
             # Add table section header
             f.write("\n### 📊 Search Results Table\n\n")
-            f.write(f"Showing {min(len(data_rows), max_rows)}/{len(data_rows)} rows from `{os.path.basename(csv_file_path)}`:\n\n")
+            f.write(f"Showing {len(data_rows)}/{total_rows} rows from `{os.path.basename(csv_file_path)}`:\n\n")
             
             # Helper function to truncate text for markdown
             def format_cell_md(text: str) -> str:
@@ -113,12 +141,12 @@ def _display_markdown_table(github_step_summary: str, csv_file_path: str, header
                 displayed_rows += 1
             
             # Add note about remaining rows
-            if len(data_rows) > max_rows:
-                f.write(f"\n*... and {len(data_rows) - max_rows} more rows (showing first {max_rows})*\n")
+            if total_rows > max_rows:
+                f.write(f"\n*... and {total_rows - max_rows} more rows (showing first {max_rows})*\n")
             
             f.write("\n")
         
-        print(f"📊 Table with {min(len(data_rows), max_rows)}/{len(data_rows)} rows added to GitHub job summary")
+        print(f"📊 Table with {len(data_rows)}/{total_rows} rows added to GitHub job summary")
         return True
         
     except Exception as e:
@@ -126,13 +154,14 @@ def _display_markdown_table(github_step_summary: str, csv_file_path: str, header
         return False
 
 
-def _display_console_table(headers: List[str], data_rows: List[List[str]], max_rows: int, max_col_width: int) -> bool:
+def _display_console_table(headers: List[str], data_rows: List[List[str]], total_rows: int, max_rows: int, max_col_width: int) -> bool:
     """
     Display CSV content as Unicode table in console.
     
     Args:
         headers: CSV headers
-        data_rows: CSV data rows
+        data_rows: CSV data rows to display
+        total_rows: Number of data rows in the CSV file
         max_rows: Maximum rows to display
         max_col_width: Maximum column width
         
@@ -150,58 +179,39 @@ def _display_console_table(headers: List[str], data_rows: List[List[str]], max_r
                     max_width = max(max_width, len(content))
             col_widths.append(min(max_width, max_col_width))
         
-        # Helper function to truncate and pad text
+        # Helper function to truncate text; padding is done by the row template
         def format_cell(text: str, width: int) -> str:
             text = str(text)
             if len(text) > width:
                 return text[:width-3] + "..."
-            return text.ljust(width)
+            return text
+        
+        # Build the row template and border lines once for this set of columns
+        row_template = "│" + "".join(f" {{:<{width}}} │" for width in col_widths)
+        column_rules = ["─" * (width + 2) for width in col_widths]
+        sep_line = "├" + "┼".join(column_rules) + "┤"
+        bottom_line = "└" + "┴".join(column_rules) + "┘"
         
         # Display table
-        print(f"\n📊 Batch Search Results (showing {min(len(data_rows), max_rows)}/{len(data_rows)} rows):")
+        print(f"\n📊 Batch Search Results (showing {len(data_rows)}/{total_rows} rows):")
         print("=" * (sum(col_widths) + len(headers) * 3 + 1))
         
         # Header row
-        header_line = "│"
-        for i, header in enumerate(headers):
-            header_line += f" {format_cell(header, col_widths[i])} │"
-        print(header_line)
+        print(row_template.format(*map(format_cell, headers, col_widths)))
         
         # Separator line
-        sep_line = "├"
-        for i, width in enumerate(col_widths):
-            sep_line += "─" * (width + 2)
-            if i < len(col_widths) - 1:
-                sep_line += "┼"
-            else:
-                sep_line += "┤"
         print(sep_line)
         
         # Data rows
-        displayed_rows = 0
-        for row in data_rows:
-            if displayed_rows >= max_rows:
-                break
-            
-            row_line = "│"
-            for i, col_width in enumerate(col_widths):
-                cell_content = row[i] if i < len(row) else ""
-                row_line += f" {format_cell(cell_content, col_width)} │"
-            print(row_line)
-            displayed_rows += 1
+        for row in data_rows[:max_rows]:
+            cells = row[:len(col_widths)] + [""] * (len(col_widths) - len(row))
+            print(row_template.format(*map(format_cell, cells, col_widths)))
         
         # Bottom border
-        bottom_line = "└"
-        for i, width in enumerate(col_widths):
-            bottom_line += "─" * (width + 2)
-            if i < len(col_widths) - 1:
-                bottom_line += "┴"
-            else:
-                bottom_line += "┘"
         print(bottom_line)
         
-        if len(data_rows) > max_rows:
-            print(f"... and {len(data_rows) - max_rows} more rows (showing first {max_rows})")
+        if total_rows > max_rows:
+            print(f"... and {total_rows - max_rows} more rows (showing first {max_rows})")
         
         return True
         
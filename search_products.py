@@ -16,6 +16,7 @@ import sys
 import argparse
 import re
 from datetime import datetime
+from operator import itemgetter
 from typing import Dict, Any, List
 
 from utils import format_search_string, compute_rapidfuzz_score, extract_product_names, compute_given_name
@@ -74,7 +75,7 @@ def apply_rapidfuzz_scoring(search_string: str, results: List[Dict[str, Any]]) -
         result['rapidfuzz_score'] = rapidfuzz_score
     
     # Sort by RapidFuzz score in descending order
-    results.sort(key=lambda x: x.get('rapidfuzz_score', 0), reverse=True)
+    results.sort(key=itemgetter('rapidfuzz_score'), reverse=True)
     
     return results
 
@@ -90,6 +91,9 @@ def search_products(search_string: str) -> Dict[str, Any]:
     Returns:
         Dictionary containing search results and metadata
     """
+    # Capture the run timestamp once; save_results reuses it for the filename
+    run_timestamp = datetime.now()
+    
     try:
         from pymongo import MongoClient
         from pymongo.errors import ConnectionFailure, ConfigurationError
@@ -142,7 +146,7 @@ def search_products(search_string: str) -> Dict[str, Any]:
             print("Performing MongoDB search...")
             direct_results = search_products_direct(collection, current_search_string, current_formatted_string)
             
-            # Add given_name field to direct results
+            # Add given_name field to direct results (the shallow copy below shares these dicts)
             for result in direct_results:
                 result['given_name'] = compute_given_name(result)
             
@@ -150,10 +154,6 @@ def search_products(search_string: str) -> Dict[str, Any]:
             print("Computing RapidFuzz scores...")
             direct_results_with_rapidfuzz = apply_rapidfuzz_scoring(current_search_string, direct_results.copy())
             
-            # Add given_name field to rapidfuzz results 
-            for result in direct_results_with_rapidfuzz:
-                result['given_name'] = compute_given_name(result)
-            
             # Check if we have good results
             if direct_results_with_rapidfuzz:
                 best_score = direct_results_with_rapidfuzz[0].get('rapidfuzz_score', 0)
@@ -247,7 +247,7 @@ def search_products(search_string: str) -> Dict[str, Any]:
         
         # Prepare results
         results = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": run_timestamp.isoformat(),
             "input_string": search_string,
             "formatted_string": formatted_string,
             "direct_search": {
@@ -352,8 +352,9 @@ def save_results(results: Dict[str, Any], output_file: str = None) -> str:
         The filename where results were saved
     """
     if not output_file:
-        # Generate filename with timestamp
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        # Generate filename with timestamp, reusing the search run timestamp when available
+        run_timestamp = results.get('timestamp')
+        timestamp = (datetime.fromisoformat(run_timestamp) if run_timestamp else datetime.now()).strftime("%Y%m%d_%H%M%S")
         safe_input = re.sub(r'[^\w\s-]', '', results.get('input_string', 'search')).strip()
         safe_input = re.sub(r'[-\s]+', '_', safe_input)[:30]  # Limit length
         output_file = f"search_results_{safe_input}_{timestamp}.json"
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Unit tests for storing categories in the download_products module.
+Tests the store_categories_collection function without requiring a real MongoDB connection.
+"""
+
+import pytest
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+import download_products
+from download_products import store_categories_collection
+
+
+class MockBulkWriteResult:
+    def __init__(self, upserted_count, matched_count):
+        self.upserted_count = upserted_count
+        self.matched_count = matched_count
+
+
+class MockCollection:
+    def __init__(self, indexes=None, full_name='test.categories', errors=None):
+        self.full_name = full_name
+        self.errors = list(errors or [])
+        self.indexes = indexes if indexes is not None else [{'key': {'_id': 1}}]
+        self.created_indexes = []
+        self.list_indexes_calls = 0
+        self.bulk_write_calls = []
+
+    def list_indexes(self):
+        self.list_indexes_calls += 1
+        return iter(self.indexes)
+
+    def create_index(self, index_spec):
+        self.created_indexes.append(index_spec)
+
+    def bulk_write(self, requests, ordered=True):
+        self.bulk_write_calls.append((list(requests), ordered))
+        if self.errors:
+            error = self.errors.pop(0)
+            if error:
+                raise error
+        return MockBulkWriteResult(upserted_count=len(requests), matched_count=0)
+
+
+class MockDB:
+    def __init__(self, collection):
+        self.collection = collection
+
+    def __getitem__(self, name):
+        return self.collection
+
+
+def category_upsert(name, ancestors):
+    """Build the upsert operation expected for a category."""
+    return UpdateOne({'name': name}, {'$set': {'name': name, 'ancestors': ancestors}}, upsert=True)
+
+
+@pytest.fixture(autouse=True)
+def reset_index_cache():
+    """Forget collections indexed by previous tests."""
+    download_products._INDEXED_COLLECTIONS.clear()
+    yield
+    download_products._INDEXED_COLLECTIONS.clear()
+
+
+class TestCategoriesCollection:
+    """Test class for store_categories_collection function."""
+
+    @pytest.mark.parametrize("unique_last_categories,expected_requests", [
+        # Categories are upserted with their ancestors
+        (
+            {
+                "Chocolate Spreads": "Food > Spreads > Chocolate Spreads",
+                "Cookies": "Food > Snacks > Cookies",
+            },
+            [
+                category_upsert("Chocolate Spreads", ["Food", "Spreads"]),
+                category_upsert("Cookies", ["Food", "Snacks"]),
+            ]
+        ),
+
+        # Top-level category has no ancestors
+        ({"Food": "Food"}, [category_upsert("Food", [])]),
+
+        # Extra spaces around path separators are stripped
+        (
+            {"WithSpaces": "Food  >  Drinks  >  WithSpaces"},
+            [category_upsert("WithSpaces", ["Food", "Drinks"])]
+        ),
+
+        # Empty entries and name/path mismatches are skipped
+        (
+            {
+                "": "Food > Empty",
+                "No Path": "",
+                "Mismatch": "Food > Something Else",
+                "Valid": "Food > Valid",
+            },
+            [category_upsert("Valid", ["Food"])]
+        ),
+
+        # Nothing to store
+        ({}, []),
+    ])
+    def test_store_categories_collection_parametrized(self, unique_last_categories, expected_requests):
+        """Test the upserts sent for various category mappings in one unordered bulk_write."""
+        collection = MockCollection()
+
+        store_categories_collection(MockDB(collection), unique_last_categories)
+
+        expected_calls = [(expected_requests, False)] if expected_requests else []
+        assert collection.bulk_write_calls == expected_calls
+
+    @pytest.mark.parametrize("indexes,expected_created_indexes", [
+        # Missing name index is created
+        ([{'key': {'_id': 1}}], ['name']),
+
+        # Existing name index is not recreated
+        ([{'key': {'_id': 1}}, {'key': {'name': 1}}], []),
+    ])
+    def test_store_categories_collection_name_index(self, indexes, expected_created_indexes):
+        """Test that the name index is created only when it does not exist."""
+        collection = MockCollection(indexes=indexes)
+
+        store_categories_collection(MockDB(collection), {"Food": "Food"})
+
+        assert collection.created_indexes == expected_created_indexes
+
+    def test_store_categories_collection_index_checked_once(self):
+        """Test that repeated calls check the name index only once per collection."""
+        collection = MockCollection()
+
+        store_categories_collection(MockDB(collection), {"Food": "Food"})
+        store_categories_collection(MockDB(collection), {"Drinks": "Drinks"})
+
+        assert collection.list_indexes_calls == 1
+        assert collection.created_indexes == ['name']
+        assert len(collection.bulk_write_calls) == 2
+
+    def test_store_categories_collection_batches(self, monkeypatch):
+        """Test that large category sets are split into several bulk_write calls."""
+        monkeypatch.setattr(download_products, 'CATEGORIES_BULK_WRITE_BATCH_SIZE', 2)
+        collection = MockCollection()
+        unique_last_categories = {f"Category {i}": f"Food > Category {i}" for i in range(5)}
+
+        store_categories_collection(MockDB(collection), unique_last_categories)
+
+        assert [len(requests) for requests, _ in collection.bulk_write_calls] == [2, 2, 1]
+
+    def test_store_categories_collection_batch_write_error(self, monkeypatch, capsys):
+        """Test that a failed upsert in one batch does not stop the later batches."""
+        monkeypatch.setattr(download_products, 'CATEGORIES_BULK_WRITE_BATCH_SIZE', 2)
+        error = BulkWriteError({
+            'nUpserted': 1,
+            'nMatched': 0,
+            'writeErrors': [{'index': 1, 'errmsg': 'boom', 'op': {'q': {'name': 'Category 1'}}}]
+        })
+        collection = MockCollection(errors=[error])
+        unique_last_categories = {f"Category {i}": f"Food > Category {i}" for i in range(5)}
+
+        store_categories_collection(MockDB(collection), unique_last_categories)
+
+        assert [len(requests) for requests, _ in collection.bulk_write_calls] == [2, 2, 1]
+        output = capsys.readouterr().out
+        assert "Error upserting category Category 1: boom" in output
+        assert "New categories inserted: 4" in output
+        assert "Failed categories: 1" in output
+
+
+if __name__ == "__main__":
+    # Allow running tests directly
+    pytest.main([__file__])
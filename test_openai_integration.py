@@ -3,7 +3,11 @@
 Simple test for OpenAI integration without requiring MongoDB or API keys.
 """
 
-from openai_assistant import OpenAIAssistant, SCORE_THRESHOLD
+import json
+import os
+import tempfile
+
+from openai_assistant import OpenAIAssistant, SCORE_THRESHOLD, _export_conversation_file
 
 
 def test_openai_assistant_initialization():
@@ -75,6 +79,53 @@ def test_level2_processing_without_api():
     print("✓ Level 2 processing handles missing API key gracefully")
 
 
+def test_export_conversations_keeps_unicode_unescaped():
+    """Test that exported conversations are written as raw UTF-8, not \\uXXXX escapes."""
+    assistant = OpenAIAssistant()
+    saved_conversations = (assistant.level1_conversation, assistant.level2_conversation)
+    assistant.level1_conversation = [{"role": "user", "content": "Żywność, Pâte à tartiner"}]
+    assistant.level2_conversation = []
+    
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            exported_files = assistant.export_conversations(temp_dir)
+            
+            assert list(exported_files) == ["level1"]
+            with open(exported_files["level1"], 'rb') as f:
+                raw = f.read()
+            assert "Żywność".encode('utf-8') in raw
+            assert b"\\u" not in raw
+            assert json.loads(raw.decode('utf-8'))["conversation"] == assistant.level1_conversation
+            assert not os.path.exists(os.path.join(temp_dir, "openai_level2_conversation.json"))
+    finally:
+        assistant.level1_conversation, assistant.level2_conversation = saved_conversations
+    print("✓ Conversation export keeps unicode unescaped")
+
+
+def test_export_conversation_file():
+    """Test writing a single conversation file without an assistant instance."""
+    conversation = [
+        {"role": "user", "content": "Krówka Śmietankowa"},
+        {"role": "assistant", "content": "valid_product"}
+    ]
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "conversation.json")
+        _export_conversation_file(conversation, "gpt-4o-mini", path)
+        
+        with open(path, 'rb') as f:
+            raw = f.read()
+        assert "Krówka Śmietankowa".encode('utf-8') in raw
+        assert b"\\u" not in raw
+        
+        exported = json.loads(raw.decode('utf-8'))
+        assert exported["model"] == "gpt-4o-mini"
+        assert exported["conversation"] == conversation
+        assert exported["total_messages"] == 2
+        assert "exported_at" in exported
+    print("✓ Conversation file export writes model, messages and count")
+
+
 if __name__ == "__main__":
     print("Testing OpenAI Integration...")
     print("=" * 40)
@@ -85,6 +136,8 @@ if __name__ == "__main__":
     test_singleton_pattern()
     test_level1_processing_without_api()
     test_level2_processing_without_api()
+    test_export_conversations_keeps_unicode_unescaped()
+    test_export_conversation_file()
     
     print("\n✅ All tests passed!")
     print("\nNote: To fully test with real OpenAI API:")
@@ -46,9 +46,9 @@ def test_search_output_format():
     print(f"Quantity: {sample_document['quantity']}")
     
     # Validate structure maintains MongoDB format with added fields
-    required_fields = ['_id', 'score', 'product_name', 'brands', 'categories', 'labels', 'quantity']
-    for field in required_fields:
-        assert field in sample_document, f"Missing required field: {field}"
+    required_fields = {'_id', 'score', 'product_name', 'brands', 'categories', 'labels', 'quantity'}
+    missing_fields = required_fields.difference(sample_document)
+    assert not missing_fields, f"Missing required fields: {sorted(missing_fields)}"
     
     # Validate new fields were added
     assert 'rapidfuzz_score' in sample_document, "Missing rapidfuzz_score field"
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Unit tests for batched product upserts in the download_products module.
+Tests upsert_products_batch and the product flush in download_from_huggingface without requiring a real MongoDB connection.
+"""
+
+import sys
+import types
+
+import pymongo
+import pytest
+from pymongo import ReplaceOne
+from pymongo.errors import BulkWriteError
+
+import download_products
+from download_products import upsert_products_batch
+
+
+class MockBulkWriteResult:
+    def __init__(self, upserted_count, matched_count):
+        self.upserted_count = upserted_count
+        self.matched_count = matched_count
+
+
+class MockCollection:
+    def __init__(self, error=None):
+        self.error = error
+        self.bulk_write_calls = []
+
+    def bulk_write(self, requests, ordered=True):
+        self.bulk_write_calls.append((list(requests), ordered))
+        if self.error:
+            raise self.error
+        return MockBulkWriteResult(upserted_count=len(requests) - 1, matched_count=1)
+
+
+def product_upsert(product_id):
+    """Build the upsert operation queued for a product."""
+    return ReplaceOne({'_id': product_id}, {'_id': product_id, 'search_string': product_id}, upsert=True)
+
+
+class TestUpsertProductsBatch:
+    """Test class for upsert_products_batch function."""
+
+    def test_upsert_products_batch_success(self):
+        """Test that a batch is sent in one unordered bulk_write and stored products are counted."""
+        collection = MockCollection()
+        operations = [product_upsert("p1"), product_upsert("p2"), product_upsert("p3")]
+
+        stored = upsert_products_batch(collection, operations)
+
+        assert stored == 3
+        assert collection.bulk_write_calls == [(operations, False)]
+
+    def test_upsert_products_batch_partial_failure(self):
+        """Test that failed upserts are subtracted and the rest of the batch is counted."""
+        error = BulkWriteError({
+            'writeErrors': [{'index': 1, 'errmsg': 'boom', 'op': {'q': {'_id': 'p2'}}}]
+        })
+        collection = MockCollection(error=error)
+        operations = [product_upsert("p1"), product_upsert("p2"), product_upsert("p3")]
+
+        assert upsert_products_batch(collection, operations) == 2
+
+    def test_upsert_products_batch_connection_error(self):
+        """Test that an unexpected error is reported and nothing is counted as stored."""
+        collection = MockCollection(error=RuntimeError("connection lost"))
+
+        assert upsert_products_batch(collection, [product_upsert("p1")]) == 0
+
+
+class MockAdmin:
+    def command(self, name):
+        return {'ok': 1}
+
+
+class MockClient:
+    def __init__(self, collection):
+        self.admin = MockAdmin()
+        self.collection = collection
+
+    def get_database(self):
+        return {'products-catalog': self.collection}
+
+    def close(self):
+        pass
+
+
+class FailingStream:
+    """Streaming dataset that yields some records and then fails."""
+
+    def __init__(self, records):
+        self.records = records
+
+    def filter(self, function):
+        return self
+
+    def __iter__(self):
+        yield from self.records
+        raise ConnectionError("stream interrupted")
+
+
+def valid_record(code):
+    """Build a Polish product record that passes validation."""
+    return {
+        'code': code,
+        'lang': 'pl',
+        'product_name': [{'lang': 'main', 'text': f'Product {code}'}],
+        'categories': 'Food,Snacks',
+    }
+
+
+class TestDownloadStreamFailure:
+    """Test that queued products are stored when the dataset stream fails."""
+
+    def test_pending_products_flushed_when_stream_fails(self, monkeypatch):
+        """Test that products queued before a stream error are still written to MongoDB."""
+        collection = MockCollection()
+        records = [valid_record("p1"), valid_record("p2"), valid_record("p3")]
+
+        datasets_module = types.ModuleType('datasets')
+        datasets_module.load_dataset = lambda *args, **kwargs: FailingStream(records)
+        monkeypatch.setitem(sys.modules, 'datasets', datasets_module)
+        monkeypatch.setattr(pymongo, 'MongoClient', lambda uri: MockClient(collection))
+        monkeypatch.setenv('MONGO_URI', 'mongodb://localhost:27017/test')
+        monkeypatch.setenv('SAVE_TO_MONGO', 'true')
+
+        assert download_products.download_from_huggingface() == []
+
+        assert len(collection.bulk_write_calls) == 1
+        requests, ordered = collection.bulk_write_calls[0]
+        assert [request._filter['_id'] for request in requests] == ["p1", "p2", "p3"]
+        assert ordered is False
+
+
+if __name__ == "__main__":
+    # Allow running tests directly
+    pytest.main([__file__])
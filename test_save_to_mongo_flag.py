@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the SAVE_TO_MONGO flag in the download_products module.
+Tests the is_save_to_mongo_enabled function with various environment values.
+"""
+
+import pytest
+from download_products import is_save_to_mongo_enabled
+
+
+class TestSaveToMongoFlag:
+    """Test class for is_save_to_mongo_enabled function."""
+
+    @pytest.mark.parametrize("value", ['true', 'True', 'TRUE', '1', 'yes', 'YES', 'on', 'On', ' true '])
+    def test_save_to_mongo_enabled(self, monkeypatch, value):
+        """Test that truthy values enable MongoDB storage."""
+        monkeypatch.setenv('SAVE_TO_MONGO', value)
+        assert is_save_to_mongo_enabled() is True
+
+    @pytest.mark.parametrize("value", ['false', 'False', '0', 'no', 'off', '', 'maybe'])
+    def test_save_to_mongo_disabled(self, monkeypatch, value):
+        """Test that any other value disables MongoDB storage."""
+        monkeypatch.setenv('SAVE_TO_MONGO', value)
+        assert is_save_to_mongo_enabled() is False
+
+    def test_save_to_mongo_default(self, monkeypatch):
+        """Test that MongoDB storage is enabled when the variable is not set."""
+        monkeypatch.delenv('SAVE_TO_MONGO', raising=False)
+        assert is_save_to_mongo_enabled() is True
+
+
+if __name__ == "__main__":
+    # Allow running tests directly
+    pytest.main([__file__])
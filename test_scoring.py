@@ -51,7 +51,10 @@ class TestScoringFunctions:
         # Exact match should score high
         score = score_product_names("nutella", product_names)
         assert score > 80
-        
+
+        # Name starting with the query is a perfect match
+        assert score_product_names("Nutella Haz", product_names) == 100.0
+
         # Partial match should score moderately
         score = score_product_names("hazelnut", product_names)
         assert score > 50
@@ -13,72 +13,105 @@ from contextlib import redirect_stdout
 from search_batch import display_csv_as_table
 
 
+HEADERS = ['Number', 'Input string', 'Given Name', 'Score', 'ID', 'Categories', 'Product Names']
+
+
+def build_csv(rows):
+    """Build an in-memory CSV stream from a list of rows."""
+    csv_stream = StringIO()
+    csv.writer(csv_stream).writerows(rows)
+    csv_stream.seek(0)
+    return csv_stream
+
+
 def test_display_csv_as_table_basic():
     """Test basic CSV table display functionality."""
+    csv_stream = build_csv([
+        HEADERS,
+        ['1.Mongo', 'nutella chocolate', 'Hazelnut Spreads', '15.42', '507f1f77bcb8218b39000001', 'Spreads,Sweet spreads', 'Nutella; Chocolate spread'],
+        ['1.Fuzzy', 'nutella chocolate', 'Chocolate Spreads', '125.75', '507f1f77bcb8218b39000002', 'Chocolate spreads', 'Hazelnut chocolate spread'],
+    ])
+    
+    # Temporarily unset GITHUB_STEP_SUMMARY to test console output
+    original_github_env = os.environ.get('GITHUB_STEP_SUMMARY')
+    if 'GITHUB_STEP_SUMMARY' in os.environ:
+        del os.environ['GITHUB_STEP_SUMMARY']
+    
+    try:
+        # Capture output
+        output = StringIO()
+        with redirect_stdout(output):
+            result = display_csv_as_table(csv_stream, max_rows=10, max_col_width=25)
+    finally:
+        # Restore environment variable
+        if original_github_env is not None:
+            os.environ['GITHUB_STEP_SUMMARY'] = original_github_env
+    
+    # Check return value
+    assert result == True, "Function should return True for successful display"
+    
+    # Check output content
+    output_str = output.getvalue()
+    assert "📊 Batch Search Results" in output_str, "Should contain results header"
+    assert "1.Mongo" in output_str, "Should contain first row data"
+    assert "nutella chocolate" in output_str, "Should contain input string"
+    assert "Hazelnut Spreads" in output_str, "Should contain given name"
+    assert "15.42" in output_str, "Should contain score"
+    assert "│" in output_str, "Should contain table borders"
+    assert "├" in output_str, "Should contain table separators"
+    assert "└" in output_str, "Should contain table bottom border"
+
+
+def test_display_csv_as_table_file_path():
+    """Test table display reading from a CSV file path."""
     # Create a temporary CSV file
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False) as f:
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False, newline='', encoding='utf-8') as f:
         writer = csv.writer(f)
-        writer.writerow(['Number', 'Input string', 'Given Name', 'Score', 'ID', 'Categories', 'Product Names'])
+        writer.writerow(HEADERS)
         writer.writerow(['1.Mongo', 'nutella chocolate', 'Hazelnut Spreads', '15.42', '507f1f77bcb8218b39000001', 'Spreads,Sweet spreads', 'Nutella; Chocolate spread'])
-        writer.writerow(['1.Fuzzy', 'nutella chocolate', 'Chocolate Spreads', '125.75', '507f1f77bcb8218b39000002', 'Chocolate spreads', 'Hazelnut chocolate spread'])
         temp_file = f.name
     
+    # Temporarily unset GITHUB_STEP_SUMMARY to test console output
+    original_github_env = os.environ.get('GITHUB_STEP_SUMMARY')
+    if 'GITHUB_STEP_SUMMARY' in os.environ:
+        del os.environ['GITHUB_STEP_SUMMARY']
+    
     try:
-        # Temporarily unset GITHUB_STEP_SUMMARY to test console output
-        original_github_env = os.environ.get('GITHUB_STEP_SUMMARY')
-        if 'GITHUB_STEP_SUMMARY' in os.environ:
-            del os.environ['GITHUB_STEP_SUMMARY']
-        
         # Capture output
         output = StringIO()
         with redirect_stdout(output):
             result = display_csv_as_table(temp_file, max_rows=10, max_col_width=25)
         
-        # Restore environment variable
-        if original_github_env is not None:
-            os.environ['GITHUB_STEP_SUMMARY'] = original_github_env
-        
         # Check return value
         assert result == True, "Function should return True for successful display"
         
         # Check output content
         output_str = output.getvalue()
-        assert "📊 Batch Search Results" in output_str, "Should contain results header"
-        assert "1.Mongo" in output_str, "Should contain first row data"
-        assert "nutella chocolate" in output_str, "Should contain input string"
+        assert "showing 1/1 rows" in output_str, "Should show correct row count"
         assert "Hazelnut Spreads" in output_str, "Should contain given name"
-        assert "15.42" in output_str, "Should contain score"
-        assert "│" in output_str, "Should contain table borders"
-        assert "├" in output_str, "Should contain table separators"
-        assert "└" in output_str, "Should contain table bottom border"
         
     finally:
+        # Restore environment variable
+        if original_github_env is not None:
+            os.environ['GITHUB_STEP_SUMMARY'] = original_github_env
+        
         # Clean up
         os.unlink(temp_file)
 
 
 def test_display_csv_as_table_empty_file():
-    """Test table display with empty CSV file."""
-    # Create an empty CSV file
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False) as f:
-        temp_file = f.name
+    """Test table display with empty CSV content."""
+    # Capture output
+    output = StringIO()
+    with redirect_stdout(output):
+        result = display_csv_as_table(StringIO(), max_rows=10, max_col_width=25)
     
-    try:
-        # Capture output
-        output = StringIO()
-        with redirect_stdout(output):
-            result = display_csv_as_table(temp_file, max_rows=10, max_col_width=25)
-        
-        # Check return value
-        assert result == False, "Function should return False for empty file"
-        
-        # Check output content
-        output_str = output.getvalue()
-        assert "❌ CSV file is empty" in output_str, "Should show empty file message"
-        
-    finally:
-        # Clean up
-        os.unlink(temp_file)
+    # Check return value
+    assert result == False, "Function should return False for empty file"
+    
+    # Check output content
+    output_str = output.getvalue()
+    assert "❌ CSV file is empty" in output_str, "Should show empty file message"
 
 
 def test_display_csv_as_table_nonexistent_file():
@@ -100,124 +133,107 @@ def test_display_csv_as_table_nonexistent_file():
 
 def test_display_csv_as_table_truncation():
     """Test table display with long content that should be truncated."""
-    # Create a CSV file with long content
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False) as f:
-        writer = csv.writer(f)
-        writer.writerow(['Number', 'Input string', 'Given Name', 'Score', 'ID', 'Categories', 'Product Names'])
-        writer.writerow(['1.Mongo', 'very long product name that should be truncated', 
-                        'Very Long Category Name That Should Be Truncated Too', 
-                        '15.42', '507f1f77bcb8218b39000001', 'Very long categories list', 'Very long product names list'])
-        temp_file = f.name
+    csv_stream = build_csv([
+        HEADERS,
+        ['1.Mongo', 'very long product name that should be truncated',
+         'Very Long Category Name That Should Be Truncated Too',
+         '15.42', '507f1f77bcb8218b39000001', 'Very long categories list', 'Very long product names list'],
+    ])
+    
+    # Temporarily unset GITHUB_STEP_SUMMARY to test console output
+    original_github_env = os.environ.get('GITHUB_STEP_SUMMARY')
+    if 'GITHUB_STEP_SUMMARY' in os.environ:
+        del os.environ['GITHUB_STEP_SUMMARY']
     
     try:
-        # Temporarily unset GITHUB_STEP_SUMMARY to test console output
-        original_github_env = os.environ.get('GITHUB_STEP_SUMMARY')
-        if 'GITHUB_STEP_SUMMARY' in os.environ:
-            del os.environ['GITHUB_STEP_SUMMARY']
-        
         # Capture output
         output = StringIO()
         with redirect_stdout(output):
-            result = display_csv_as_table(temp_file, max_rows=10, max_col_width=20)
-        
+            result = display_csv_as_table(csv_stream, max_rows=10, max_col_width=20)
+    finally:
         # Restore environment variable
         if original_github_env is not None:
             os.environ['GITHUB_STEP_SUMMARY'] = original_github_env
-        
-        # Check return value
-        assert result == True, "Function should return True for successful display"
-        
-        # Check output content
-        output_str = output.getvalue()
-        assert "..." in output_str, "Should contain truncation indicator"
-        
-    finally:
-        # Clean up
-        os.unlink(temp_file)
+    
+    # Check return value
+    assert result == True, "Function should return True for successful display"
+    
+    # Check output content
+    output_str = output.getvalue()
+    assert "..." in output_str, "Should contain truncation indicator"
 
 
 def test_display_csv_as_table_row_limit():
     """Test table display with row limit."""
-    # Create a CSV file with many rows
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False) as f:
-        writer = csv.writer(f)
-        writer.writerow(['Number', 'Input string', 'Given Name', 'Score', 'ID', 'Categories', 'Product Names'])
-        for i in range(1, 11):  # Create 10 rows
-            writer.writerow([f'{i}.Mongo', f'product{i}', f'Category{i}', f'{i}.50', f'id{i}', f'categories{i}', f'names{i}'])
-        temp_file = f.name
+    # Create CSV content with 10 rows
+    csv_stream = build_csv([HEADERS] + [
+        [f'{i}.Mongo', f'product{i}', f'Category{i}', f'{i}.50', f'id{i}', f'categories{i}', f'names{i}']
+        for i in range(1, 11)
+    ])
+    
+    # Temporarily unset GITHUB_STEP_SUMMARY to test console output
+    original_github_env = os.environ.get('GITHUB_STEP_SUMMARY')
+    if 'GITHUB_STEP_SUMMARY' in os.environ:
+        del os.environ['GITHUB_STEP_SUMMARY']
     
     try:
-        # Temporarily unset GITHUB_STEP_SUMMARY to test console output
-        original_github_env = os.environ.get('GITHUB_STEP_SUMMARY')
-        if 'GITHUB_STEP_SUMMARY' in os.environ:
-            del os.environ['GITHUB_STEP_SUMMARY']
-        
         # Capture output
         output = StringIO()
         with redirect_stdout(output):
-            result = display_csv_as_table(temp_file, max_rows=5, max_col_width=25)
-        
+            result = display_csv_as_table(csv_stream, max_rows=5, max_col_width=25)
+    finally:
         # Restore environment variable
         if original_github_env is not None:
             os.environ['GITHUB_STEP_SUMMARY'] = original_github_env
-        
-        # Check return value
-        assert result == True, "Function should return True for successful display"
-        
-        # Check output content
-        output_str = output.getvalue()
-        assert "showing 5/10 rows" in output_str, "Should show correct row count"
-        assert "and 5 more rows" in output_str, "Should indicate remaining rows"
-        
-    finally:
-        # Clean up
-        os.unlink(temp_file)
+    
+    # Check return value
+    assert result == True, "Function should return True for successful display"
+    
+    # Check output content
+    output_str = output.getvalue()
+    assert "showing 5/10 rows" in output_str, "Should show correct row count"
+    assert "and 5 more rows" in output_str, "Should indicate remaining rows"
 
 
 def test_display_csv_as_table_polish_characters():
     """Test table display with Polish characters."""
-    # Create a CSV file with Polish characters
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False, encoding='utf-8') as f:
-        writer = csv.writer(f)
-        writer.writerow(['Number', 'Input string', 'Given Name', 'Score', 'ID', 'Categories', 'Product Names'])
-        writer.writerow(['1.Mongo', 'chleb żytni', 'Pieczywo żytnie', '15.42', '507f1f77bcb8218b39000001', 'Pieczywo,Żytnie', 'Chleb żytni razowy'])
-        writer.writerow(['1.Fuzzy', 'śmietana 18%', 'Nabiał świeży', '125.75', '507f1f77bcb8218b39000002', 'Nabiał,Śmietana', 'Śmietana 18% tłuszczu'])
-        temp_file = f.name
+    csv_stream = build_csv([
+        HEADERS,
+        ['1.Mongo', 'chleb żytni', 'Pieczywo żytnie', '15.42', '507f1f77bcb8218b39000001', 'Pieczywo,Żytnie', 'Chleb żytni razowy'],
+        ['1.Fuzzy', 'śmietana 18%', 'Nabiał świeży', '125.75', '507f1f77bcb8218b39000002', 'Nabiał,Śmietana', 'Śmietana 18% tłuszczu'],
+    ])
+    
+    # Temporarily unset GITHUB_STEP_SUMMARY to test console output
+    original_github_env = os.environ.get('GITHUB_STEP_SUMMARY')
+    if 'GITHUB_STEP_SUMMARY' in os.environ:
+        del os.environ['GITHUB_STEP_SUMMARY']
     
     try:
-        # Temporarily unset GITHUB_STEP_SUMMARY to test console output
-        original_github_env = os.environ.get('GITHUB_STEP_SUMMARY')
-        if 'GITHUB_STEP_SUMMARY' in os.environ:
-            del os.environ['GITHUB_STEP_SUMMARY']
-        
         # Capture output
         output = StringIO()
         with redirect_stdout(output):
-            result = display_csv_as_table(temp_file, max_rows=10, max_col_width=25)
-        
+            result = display_csv_as_table(csv_stream, max_rows=10, max_col_width=25)
+    finally:
         # Restore environment variable
         if original_github_env is not None:
             os.environ['GITHUB_STEP_SUMMARY'] = original_github_env
-        
-        # Check return value
-        assert result == True, "Function should return True for successful display"
-        
-        # Check output content
-        output_str = output.getvalue()
-        assert "chleb żytni" in output_str, "Should contain Polish characters"
-        assert "Pieczywo żytnie" in output_str, "Should contain Polish characters"
-        assert "śmietana 18%" in output_str, "Should contain Polish characters"
-        assert "Nabiał świeży" in output_str, "Should contain Polish characters"
-        assert "Pieczywo,Żytnie" in output_str, "Should contain categories field"
-        assert "Chleb żytni razowy" in output_str, "Should contain product names field"
-        
-    finally:
-        # Clean up
-        os.unlink(temp_file)
+    
+    # Check return value
+    assert result == True, "Function should return True for successful display"
+    
+    # Check output content
+    output_str = output.getvalue()
+    assert "chleb żytni" in output_str, "Should contain Polish characters"
+    assert "Pieczywo żytnie" in output_str, "Should contain Polish characters"
+    assert "śmietana 18%" in output_str, "Should contain Polish characters"
+    assert "Nabiał świeży" in output_str, "Should contain Polish characters"
+    assert "Pieczywo,Żytnie" in output_str, "Should contain categories field"
+    assert "Chleb żytni razowy" in output_str, "Should contain product names field"
 
 
 if __name__ == "__main__":
     test_display_csv_as_table_basic()
+    test_display_csv_as_table_file_path()
     test_display_csv_as_table_empty_file()
     test_display_csv_as_table_nonexistent_file()
     test_display_csv_as_table_truncation()
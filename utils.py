@@ -6,7 +6,29 @@ Contains string formatting and processing functions and RapidFuzz scoring.
 
 import re
 from typing import Dict, Any, List
-from rapidfuzz import fuzz
+from rapidfuzz import fuzz, process
+
+
+# Lowercase and uppercase letters, including Polish characters
+_LOWER = 'a-ząćęłńóśźż'
+_UPPER = 'A-ZĄĆĘŁŃÓŚŹŻ'
+
+# Commas and semicolons act as word separators
+_PUNCTUATION_TO_SPACE = str.maketrans(',;', '  ')
+
+# Zero-width positions where a space is inserted:
+# - camelCase: lowercase followed by uppercase (krówkaŚmietankowa -> krówka Śmietankowa)
+# - acronyms: uppercase followed by uppercase+lowercase (XMLHttp -> XML Http)
+# - numbers: letter followed by digit and digit followed by letter (Ameryk500g -> Ameryk 500 g)
+_WORD_BOUNDARY_PATTERN = re.compile(
+    rf'(?<=[{_LOWER}])(?=[{_UPPER}])'
+    rf'|(?<=[{_UPPER}])(?=[{_UPPER}][{_LOWER}])'
+    rf'|(?<=[{_LOWER}{_UPPER}])(?=\d)'
+    rf'|(?<=\d)(?=[{_LOWER}{_UPPER}])'
+)
+
+# Language prefix of category tags ("en:", "fr:")
+_LANGUAGE_PREFIX_PATTERN = re.compile(r'^[a-z]{2}:')
 
 
 def format_search_string(input_string: str) -> str:
@@ -18,8 +40,8 @@ def format_search_string(input_string: str) -> str:
     - Convert to lowercase
     - Keep space " " as separator
     
-    Uses regex-based approach for camelCase splitting to support
-    all character sets including Polish characters.
+    Uses a single precompiled regex for camelCase and number splitting
+    to support all character sets including Polish characters.
     
     Args:
         input_string: The input search string
@@ -41,66 +63,62 @@ def format_search_string(input_string: str) -> str:
         return ""
     
     # Step 1: Replace commas and semicolons with spaces first
-    formatted = re.sub(r'[,;]', ' ', input_string)
+    formatted = input_string.translate(_PUNCTUATION_TO_SPACE)
     
-    # Step 2: Split camelCase using regex approach
-    formatted = _split_camel_case_regex(formatted)
+    # Step 2: Split camelCase and split numbers from letters in a single pass
+    formatted = _WORD_BOUNDARY_PATTERN.sub(' ', formatted)
     
-    # Step 3: Split numbers from letters - insert space between letters and numbers
-    # Insert space before numbers that follow letters (including Unicode letters)
-    formatted = re.sub(r'([a-zA-ZąćęłńóśźżĄĆĘŁŃÓŚŹŻ])(\d)', r'\1 \2', formatted)
-    # Insert space after numbers that are followed by letters  
-    formatted = re.sub(r'(\d)([a-zA-ZąćęłńóśźżĄĆĘŁŃÓŚŹŻ])', r'\1 \2', formatted)
-    
-    # Step 4: Convert to lowercase
+    # Step 3: Convert to lowercase
     formatted = formatted.lower()
     
-    # Step 5: Normalize spaces - replace multiple spaces with single space and strip
-    formatted = re.sub(r'\s+', ' ', formatted).strip()
-    
-    return formatted
+    # Step 4: Normalize spaces - collapse whitespace runs to single spaces and strip
+    return ' '.join(formatted.split())
 
 
-def _split_camel_case_regex(text: str) -> str:
+def extract_product_names(product_name_data: List[Dict[str, str]]) -> List[str]:
     """
-    Split camelCase using regex patterns.
+    Extract unique product names from product_name array.
     
     Args:
-        text: Input text to split
+        product_name_data: The product_name field from MongoDB document
         
     Returns:
-        Text with camelCase split by spaces
+        List of unique product names
     """
-    # Split on lowercase letter followed by uppercase letter (including Polish characters)
-    text = re.sub(r'([a-ząćęłńóśźż])([A-ZĄĆĘŁŃÓŚŹŻ])', r'\1 \2', text)
-    
-    # Split consecutive uppercase letters when followed by lowercase letter (e.g., XMLHttp -> XML Http)
-    # This handles cases like "XMLHttpRequest" -> "XML Http Request"
-    text = re.sub(r'([A-ZĄĆĘŁŃÓŚŹŻ]+)([A-ZĄĆĘŁŃÓŚŹŻ][a-ząćęłńóśźż])', r'\1 \2', text)
-    
-    return text
+    if not isinstance(product_name_data, list):
+        return []
+    
+    # dict.fromkeys drops duplicates while keeping the first-seen order
+    return list(dict.fromkeys(
+        name_obj['text'] for name_obj in product_name_data
+        if isinstance(name_obj, dict) and name_obj.get('text')
+    ))
 
 
-def extract_product_names(product_name_data: List[Dict[str, str]]) -> List[str]:
+def _best_ratio(query: str, choices: List[str], score_cutoff: float = 0.0) -> float:
     """
-    Extract unique product names from product_name array.
+    Best partial_ratio or token_sort_ratio of the query against any of the choices.
+    
+    Each scorer runs over all choices in one RapidFuzz call, and the best partial
+    score is passed as score_cutoff to the token pass so weaker choices stop early.
+    The token pass is skipped once a perfect score has been found.
     
     Args:
-        product_name_data: The product_name field from MongoDB document
+        query: Lowercased search query
+        choices: Lowercased candidate strings
+        score_cutoff: Score the result has to beat; returned when no choice does
         
     Returns:
-        List of unique product names
+        Best matching score (0-100), or score_cutoff if higher
     """
-    unique_product_names = []
-    if isinstance(product_name_data, list):
-        seen_texts = set()
-        for name_obj in product_name_data:
-            if isinstance(name_obj, dict) and 'text' in name_obj:
-                text = name_obj['text']
-                if text and text not in seen_texts:
-                    unique_product_names.append(text)
-                    seen_texts.add(text)
-    return unique_product_names
+    best_score = score_cutoff
+    for scorer in (fuzz.partial_ratio, fuzz.token_sort_ratio):
+        if best_score >= 100.0:
+            break
+        match = process.extractOne(query, choices, scorer=scorer, score_cutoff=best_score)
+        if match:
+            best_score = max(best_score, match[1])
+    return best_score
 
 
 def score_product_names(search_string: str, product_names: List[str]) -> float:
@@ -117,16 +135,16 @@ def score_product_names(search_string: str, product_names: List[str]) -> float:
     if not search_string or not product_names:
         return 0.0
     
-    best_score = 0.0
-    for name in product_names:
-        if name:
-            # Use both partial_ratio and token_sort_ratio, take the better one
-            partial_score = fuzz.partial_ratio(search_string.lower(), name.lower())
-            token_score = fuzz.token_sort_ratio(search_string.lower(), name.lower())
-            name_score = max(partial_score, token_score)
-            best_score = max(best_score, name_score)
+    query = search_string.lower()
+    names = [name.lower() for name in product_names if name]
     
-    return best_score
+    # A name containing the query (e.g. as a prefix) already gets a
+    # perfect partial_ratio, which no other name can beat
+    if any(query in name for name in names):
+        return 100.0
+    
+    # Use both partial_ratio and token_sort_ratio, take the better one
+    return _best_ratio(query, names)
 
 
 def score_brands(search_string: str, brands: str) -> float:
@@ -143,9 +161,14 @@ def score_brands(search_string: str, brands: str) -> float:
     if not search_string or not brands:
         return 0.0
     
+    query = search_string.lower()
+    brands = brands.lower()
+    
     # Use both partial_ratio and token_sort_ratio, take the better one
-    partial_score = fuzz.partial_ratio(search_string.lower(), brands.lower())
-    token_score = fuzz.token_sort_ratio(search_string.lower(), brands.lower())
+    partial_score = fuzz.partial_ratio(query, brands)
+    if partial_score == 100.0:
+        return partial_score
+    token_score = fuzz.token_sort_ratio(query, brands, score_cutoff=partial_score)
     
     return max(partial_score, token_score)
 
@@ -165,40 +188,39 @@ def score_categories(search_string: str, categories, categories_tags: List[str]
     if not search_string:
         return 0.0
     
-    scores = []
+    query = search_string.lower()
+    best_score = 0.0
     
     # Score the categories (handle both string and list formats)
     if categories:
         if isinstance(categories, list):
-            category_list = [cat.strip() for cat in categories if cat and cat.strip()]
+            category_list = [cat.strip().lower() for cat in categories if cat and cat.strip()]
         else:
-            category_list = [cat.strip() for cat in categories.split(',') if cat.strip()]
+            category_list = [cat.strip().lower() for cat in categories.split(',') if cat.strip()]
         for i, category in enumerate(category_list):
-            # Use both partial_ratio and token_sort_ratio
-            partial_score = fuzz.partial_ratio(search_string.lower(), category.lower())
-            token_score = fuzz.token_sort_ratio(search_string.lower(), category.lower())
-            cat_score = max(partial_score, token_score)
-            
             # Weight by specificity (later categories are more specific)
             specificity_weight = 1.0 + (i * 0.1)  # Increase weight for later categories
-            weighted_score = cat_score * specificity_weight
-            scores.append(weighted_score)
-    
-    # Score the category tags if available
-    if categories_tags:
-        for tag in categories_tags:
-            if tag:
-                # Remove language prefixes like "en:", "fr:" for better matching
-                clean_tag = re.sub(r'^[a-z]{2}:', '', tag)
-                clean_tag = clean_tag.replace('-', ' ')  # Convert dashes to spaces
-                
-                partial_score = fuzz.partial_ratio(search_string.lower(), clean_tag.lower())
-                token_score = fuzz.token_sort_ratio(search_string.lower(), clean_tag.lower())
-                tag_score = max(partial_score, token_score)
-                scores.append(tag_score)
+            
+            # Use both partial_ratio and token_sort_ratio; a raw score below
+            # best_score / weight cannot improve the result, so let RapidFuzz cut it off
+            cutoff = best_score / specificity_weight
+            partial_score = fuzz.partial_ratio(query, category, score_cutoff=cutoff)
+            cutoff = max(cutoff, partial_score)
+            token_score = 0.0
+            if cutoff < 100.0:
+                token_score = fuzz.token_sort_ratio(query, category, score_cutoff=cutoff)
+            cat_score = max(partial_score, token_score)
+            
+            best_score = max(best_score, cat_score * specificity_weight)
+    
+    # Score the category tags if available (they cannot improve a capped score)
+    if categories_tags and best_score < 100.0:
+        # Remove language prefixes like "en:", "fr:" and convert dashes to spaces for better matching
+        clean_tags = [_LANGUAGE_PREFIX_PATTERN.sub('', tag).replace('-', ' ').lower() for tag in categories_tags if tag]
+        best_score = _best_ratio(query, clean_tags, score_cutoff=best_score)
     
     # Return the best score, capped at 100
-    return min(max(scores) if scores else 0.0, 100.0)
+    return min(best_score, 100.0)
 
 
 def score_labels(search_string: str, labels) -> float:
@@ -215,20 +237,13 @@ def score_labels(search_string: str, labels) -> float:
     if not search_string or not labels:
         return 0.0
     
-    scores = []
-    
     # Handle both string and list formats
     if isinstance(labels, list):
-        label_list = [label.strip() for label in labels if label and label.strip()]
+        label_list = [label.strip().lower() for label in labels if label and label.strip()]
     else:
-        label_list = [label.strip() for label in labels.split(',') if label.strip()]
+        label_list = [label.strip().lower() for label in labels.split(',') if label.strip()]
     
-    for label in label_list:
-        partial_score = fuzz.partial_ratio(search_string.lower(), label.lower())
-        token_score = fuzz.token_sort_ratio(search_string.lower(), label.lower())
-        scores.append(max(partial_score, token_score))
-    
-    return max(scores) if scores else 0.0
+    return _best_ratio(search_string.lower(), label_list)
 
 
 def score_quantity(search_string: str, quantity: str) -> float:
@@ -245,9 +260,14 @@ def score_quantity(search_string: str, quantity: str) -> float:
     if not search_string or not quantity:
         return 0.0
     
+    query = search_string.lower()
+    quantity = quantity.lower()
+    
     # Use both partial_ratio and token_sort_ratio
-    partial_score = fuzz.partial_ratio(search_string.lower(), quantity.lower())
-    token_score = fuzz.token_sort_ratio(search_string.lower(), quantity.lower())
+    partial_score = fuzz.partial_ratio(query, quantity)
+    if partial_score == 100.0:
+        return partial_score
+    token_score = fuzz.token_sort_ratio(query, quantity, score_cutoff=partial_score)
     
     return max(partial_score, token_score)
 
@@ -270,13 +290,12 @@ def compute_given_name(document: Dict[str, Any]) -> str:
     categories = document.get('categories', '')
     if categories:
         # Handle both string and list formats
-        if isinstance(categories, list):
-            category_list = [cat.strip() for cat in categories if cat and cat.strip()]
-        else:
-            category_list = [cat.strip() for cat in categories.split(',') if cat.strip()]
+        raw_categories = categories if isinstance(categories, list) else categories.split(',')
         
-        # Search from last to first for category without ":" or "pl:" prefixed
-        for category in reversed(category_list):
+        # Search from last to first for category without ":" or "pl:" prefixed,
+        # stripping only the entries actually inspected
+        for raw_category in reversed(raw_categories):
+            category = raw_category.strip() if raw_category else ''
             if category:
                 # Check if category starts with "pl:" (case insensitive)
                 if category.lower().startswith('pl:'):